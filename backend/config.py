@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -21,6 +22,14 @@ class Config:
     MAX_RESULTS: int = 5         # Maximum search results to return
     MAX_HISTORY: int = 2         # Number of conversation messages to remember
     
+    # Search result cache settings
+    QUERY_CACHE_SIZE: int = 1024         # Maximum cached search results
+    # Cosine similarity at which a different query reuses a cached result. Semantic
+    # hits skip a search for paraphrases, but near-identical queries that differ in
+    # detail (e.g. "lesson 2 of X" vs "lesson 3 of X") would share results, so the
+    # default of None only reuses results for identical queries and filters.
+    QUERY_CACHE_THRESHOLD: Optional[float] = None
+    
     # Database paths
     CHROMA_PATH: str = "./chroma_db"  # ChromaDB storage location
 
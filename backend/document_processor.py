@@ -6,6 +6,11 @@ from models import Course, Lesson, CourseChunk
 class DocumentProcessor:
     """Processes course documents and extracts structured information"""
     
+    # Sentence splitter compiled once and shared by every chunk_text call.
+    # Looks for periods followed by whitespace and capital letters
+    # but ignores common abbreviations
+    SENTENCE_ENDINGS = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])')
+    
     def __init__(self, chunk_size: int, chunk_overlap: int):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
@@ -29,10 +34,7 @@ class DocumentProcessor:
         text = re.sub(r'\s+', ' ', text.strip())  # Normalize whitespace
         
         # Better sentence splitting that handles abbreviations
-        # This regex looks for periods followed by whitespace and capital letters
-        # but ignores common abbreviations
-        sentence_endings = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])')
-        sentences = sentence_endings.split(text)
+        sentences = self.SENTENCE_ENDINGS.split(text)
         
         # Clean sentences
         sentences = [s.strip() for s in sentences if s.strip()]
@@ -1,6 +1,16 @@
+import asyncio
 import chromadb
+import numpy as np
+import orjson
+import os
+import re
+import threading
 from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
+from typing import List, Dict, Any, Optional, Tuple, Set, Iterator
 from dataclasses import dataclass
 from models import Course, CourseChunk
 from sentence_transformers import SentenceTransformer
@@ -10,9 +20,22 @@ class SearchResults:
     """Container for search results with metadata"""
     documents: List[str]
     metadata: List[Dict[str, Any]]
-    distances: List[float]
+    distances: np.ndarray  # float32, one distance per document
     error: Optional[str] = None
     
+    def __post_init__(self):
+        """Store distances as a float32 array so they can be filtered without Python loops"""
+        self.distances = np.asarray(self.distances, dtype=np.float32)
+    
+    def __eq__(self, other) -> bool:
+        """Compare field by field; the generated __eq__ can't compare distance arrays"""
+        if not isinstance(other, SearchResults):
+            return NotImplemented
+        return (self.documents == other.documents
+                and self.metadata == other.metadata
+                and np.array_equal(self.distances, other.distances)
+                and self.error == other.error)
+    
     @classmethod
     def from_chroma(cls, chroma_results: Dict) -> 'SearchResults':
         """Create SearchResults from ChromaDB query results"""
@@ -30,31 +53,233 @@ class SearchResults:
     def is_empty(self) -> bool:
         """Check if results are empty"""
         return len(self.documents) == 0
+    
+    def below_threshold(self, threshold: float) -> 'SearchResults':
+        """Keep only results whose distance is below the threshold"""
+        keep = np.flatnonzero(self.distances < threshold)
+        return SearchResults(
+            documents=[self.documents[i] for i in keep],
+            metadata=[self.metadata[i] for i in keep],
+            distances=self.distances[keep],
+            error=self.error
+        )
+
+def _json_dumps(value: Any) -> str:
+    """Serialize to a JSON string (ChromaDB metadata values cannot be bytes)"""
+    return orjson.dumps(value).decode()
+
+def _json_loads(value: str) -> Any:
+    """Parse a JSON string"""
+    return orjson.loads(value)
+
+@lru_cache(maxsize=None)
+def _get_client(chroma_path: str):
+    """Open the persistent ChromaDB client for a path once per process"""
+    return chromadb.PersistentClient(
+        path=chroma_path,
+        settings=Settings(anonymized_telemetry=False)
+    )
+
+def _detect_device() -> str:
+    """Pick the fastest available torch device for the embedding model"""
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+@lru_cache(maxsize=4)
+def _get_embedding_function(model_name: str):
+    """
+    Load a sentence transformer embedding function once per model name.
+    
+    ChromaDB keeps loaded models in a class-level dict keyed by model name only,
+    so the device detected when a model is first loaded is the one it runs on
+    for the rest of the process.
+    """
+    return chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction(
+        model_name=model_name,
+        device=_detect_device()
+    )
+
+# Unicode-aware, so letters and digits in any script are kept
+_NON_ALPHANUMERIC = re.compile(r'[\W_]+')
+
+def _normalize_title(title: str) -> str:
+    """Lowercase a course title and reduce punctuation and whitespace to single spaces"""
+    return _NON_ALPHANUMERIC.sub(' ', title.casefold()).strip()
+
+# Chunk fields stored in the content collection, read in one call per chunk
+_CHUNK_FIELDS = attrgetter('content', 'course_title', 'lesson_number', 'chunk_index')
+
+# Characters replaced when deriving chunk IDs from course titles
+_ID_TRANSLATION = str.maketrans({' ': '_', '/': '_'})
+
+# ChromaDB filter builders keyed by (has course title, has lesson number)
+_FILTER_BUILDERS = {
+    (False, False): lambda course_title, lesson_number: None,
+    (True, False): lambda course_title, lesson_number: {"course_title": course_title},
+    (False, True): lambda course_title, lesson_number: {"lesson_number": lesson_number},
+    (True, True): lambda course_title, lesson_number: {"$and": [
+        {"course_title": course_title},
+        {"lesson_number": lesson_number}
+    ]},
+}
+
+class QueryCache:
+    """Bounded LRU cache of search results, matched by query text or optionally by embedding similarity"""
+    
+    def __init__(self, max_size: int = 1024, threshold: Optional[float] = None):
+        self.max_size = max_size
+        # Minimum cosine similarity for a semantic hit; None reuses results for identical queries only
+        self.threshold = threshold
+        # (filter_key, query) -> (normalized query embedding, results)
+        self._entries: OrderedDict = OrderedDict()
+        # filter_key -> (entry keys, stacked embeddings), rebuilt lazily after changes
+        self._matrices: Dict[Any, Tuple[List[Tuple], np.ndarray]] = {}
+        # Searches may run concurrently on the store's executor threads
+        self._lock = threading.Lock()
+    
+    @property
+    def semantic(self) -> bool:
+        """Whether similar (not just identical) queries can hit the cache"""
+        return self.threshold is not None
+    
+    def get(self, query: str, filter_key) -> Optional['SearchResults']:
+        """Return cached results for an identical query, without needing its embedding"""
+        key = (filter_key, query)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][1]
+    
+    def get_similar(self, embedding, filter_key) -> Optional['SearchResults']:
+        """Return cached results for the most similar query above the threshold"""
+        if not self.semantic:
+            return None
+        with self._lock:
+            key = self._most_similar(self._normalize(embedding), filter_key)
+            if key is None:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][1]
+    
+    def put(self, query: str, embedding, filter_key, results: 'SearchResults'):
+        """Store results for a query, evicting the least recently used entries"""
+        key = (filter_key, query)
+        with self._lock:
+            self._entries[key] = (self._normalize(embedding), results)
+            self._entries.move_to_end(key)
+            self._matrices.pop(filter_key, None)
+            
+            while len(self._entries) > self.max_size:
+                (evicted_filter_key, _), _ = self._entries.popitem(last=False)
+                self._matrices.pop(evicted_filter_key, None)
+    
+    def clear(self):
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+    
+    def _most_similar(self, embedding: np.ndarray, filter_key) -> Optional[Tuple]:
+        """Find the cached entry with the same filters whose query is most similar"""
+        if filter_key not in self._matrices:
+            keys = [key for key in self._entries if key[0] == filter_key]
+            if not keys:
+                return None
+            self._matrices[filter_key] = (keys, np.stack([self._entries[key][0] for key in keys]))
+        
+        # One matrix-vector product scores every candidate at once
+        keys, matrix = self._matrices[filter_key]
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        return keys[best] if scores[best] >= self.threshold else None
+    
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        """L2-normalize an embedding so dot products are cosine similarities"""
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
 
 class VectorStore:
     """Vector storage using ChromaDB for course content and metadata"""
     
-    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5):
+    # Number of chunks sent to ChromaDB per add() call
+    ADD_BATCH_SIZE = 200
+    # Number of texts the embedding model encodes per forward pass
+    EMBED_BATCH_SIZE = 64
+    # Texts above which embedding is spread over a multi-process pool
+    MULTI_PROCESS_THRESHOLD = 10_000
+    MULTI_PROCESS_BATCH_SIZE = 128
+    # Unfiltered candidates fetched per requested result before filtering in Python
+    FILTER_OVERSAMPLE = 10
+    # Content embeddings are L2-normalized, so inner product ranks like cosine
+    # without the per-comparison norm computation
+    CONTENT_COLLECTION_METADATA = {"hnsw:space": "ip"}
+    
+    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5,
+                 query_cache_size: int = 1024, query_cache_threshold: Optional[float] = None):
         self.max_results = max_results
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
-            path=chroma_path,
-            settings=Settings(anonymized_telemetry=False)
-        )
+        # Worker threads for the async methods, which run the synchronous ChromaDB calls
+        self._executor = ThreadPoolExecutor(max_workers=max(4, os.cpu_count() or 1))
+        self.query_cache = QueryCache(query_cache_size, query_cache_threshold)
+        # Catalog contents read from ChromaDB, dropped whenever the catalog changes
+        self._catalog_cache: Optional[Dict[str, Any]] = None
+        # Course title -> {lesson number: lesson link}, filled on first lookup per course
+        self._lesson_link_cache: Dict[str, Dict[int, Optional[str]]] = {}
+        # Incremented by every write. Reads note it before querying ChromaDB and only
+        # cache their result if no write happened in between.
+        self._version = 0
+        self._cache_lock = threading.Lock()
+        # Initialize ChromaDB client, shared by every VectorStore on the same path
+        self.client = _get_client(chroma_path)
         
         # Set up sentence transformer embedding function
-        self.embedding_function = chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=embedding_model
-        )
+        self.embedding_function = _get_embedding_function(embedding_model)
+        # Reuse the model loaded by the embedding function to embed content ourselves
+        self.embedder = self.embedding_function._model
         
         # Create collections for different types of data
         self.course_catalog = self._create_collection("course_catalog")  # Course titles/instructors
-        self.course_content = self._create_collection("course_content")  # Actual course material
+        self.course_content = self._create_collection("course_content", self.CONTENT_COLLECTION_METADATA)  # Actual course material
     
-    def _create_collection(self, name: str):
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in batches as a normalized float32 matrix"""
+        if len(texts) > self.MULTI_PROCESS_THRESHOLD:
+            return self._embed_multi_process(texts)
+        return self.embedder.encode(
+            texts,
+            batch_size=self.EMBED_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ).astype(np.float32, copy=False)
+    
+    def _embed_multi_process(self, texts: List[str]) -> np.ndarray:
+        """Embed a large batch of texts with one worker process per available device"""
+        pool = self.embedder.start_multi_process_pool()
+        try:
+            embeddings = self.embedder.encode_multi_process(
+                texts,
+                pool,
+                batch_size=self.MULTI_PROCESS_BATCH_SIZE,
+                normalize_embeddings=True
+            )
+        finally:
+            self.embedder.stop_multi_process_pool(pool)
+        return np.asarray(embeddings, dtype=np.float32)
+    
+    def _create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None):
         """Create or get a ChromaDB collection"""
         return self.client.get_or_create_collection(
             name=name,
+            metadata=metadata,
             embedding_function=self.embedding_function
         )
     
@@ -75,33 +300,115 @@ class VectorStore:
         Returns:
             SearchResults object with documents and metadata
         """
-        # Step 1: Resolve course name if provided
+        # Use provided limit or fall back to configured max_results
+        search_limit = limit if limit is not None else self.max_results
+        
+        # Step 1: Reuse cached results for the same query, then embed it and
+        # look for a similar cached query
+        filter_key = (course_name, lesson_number, search_limit)
+        version = self._version
+        cached_results = self.query_cache.get(query, filter_key)
+        if cached_results is not None:
+            return cached_results
+        
+        try:
+            query_embedding = self._embed([query])[0]
+        except Exception as e:
+            return SearchResults.empty(f"Search error: {str(e)}")
+        
+        cached_results = self.query_cache.get_similar(query_embedding, filter_key)
+        if cached_results is not None:
+            return cached_results
+        
+        # Step 2: Resolve course name if provided
         course_title = None
         if course_name:
             course_title = self._resolve_course_name(course_name)
             if not course_title:
                 return SearchResults.empty(f"No course found matching '{course_name}'")
         
-        # Step 2: Build filter for content search
+        # Step 3: Build filter for content search
         filter_dict = self._build_filter(course_title, lesson_number)
         
-        # Step 3: Search course content
-        # Use provided limit or fall back to configured max_results
-        search_limit = limit if limit is not None else self.max_results
-        
+        # Step 4: Search course content with the embedding computed above
         try:
-            results = self.course_content.query(
-                query_texts=[query],
-                n_results=search_limit,
-                where=filter_dict
-            )
-            return SearchResults.from_chroma(results)
+            if filter_dict:
+                search_results = self._filtered_search(
+                    query_embedding, course_title, lesson_number, filter_dict, search_limit
+                )
+            else:
+                results = self.course_content.query(
+                    query_embeddings=[query_embedding],
+                    n_results=search_limit
+                )
+                search_results = SearchResults.from_chroma(results)
         except Exception as e:
             return SearchResults.empty(f"Search error: {str(e)}")
+        
+        with self._cache_lock:
+            if version == self._version:
+                self.query_cache.put(query, query_embedding, filter_key, search_results)
+        return search_results
+    
+    async def search_async(self,
+                           query: str,
+                           course_name: Optional[str] = None,
+                           lesson_number: Optional[int] = None,
+                           limit: Optional[int] = None) -> SearchResults:
+        """
+        Run search() on a worker thread so the event loop stays free while
+        ChromaDB and the embedding model do their work.
+        
+        Takes the same arguments as search().
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.search, query, course_name, lesson_number, limit)
+    
+    def _filtered_search(self,
+                         query_embedding,
+                         course_title: Optional[str],
+                         lesson_number: Optional[int],
+                         filter_dict: Dict,
+                         limit: int) -> SearchResults:
+        """
+        Search with filters by post-filtering an oversampled unfiltered search.
+        
+        Filtered ChromaDB queries leave the HNSW index for a metadata scan, so
+        the nearest neighbours are fetched unfiltered and filtered here. Only if
+        too few of them match is the query repeated with a where= filter.
+        """
+        results = SearchResults.from_chroma(self.course_content.query(
+            query_embeddings=[query_embedding],
+            n_results=limit * self.FILTER_OVERSAMPLE
+        ))
+        
+        matches = [
+            i for i, meta in enumerate(results.metadata)
+            if (course_title is None or meta.get('course_title') == course_title)
+            and (lesson_number is None or meta.get('lesson_number') == lesson_number)
+        ][:limit]
+        
+        if len(matches) >= limit:
+            return SearchResults(
+                documents=[results.documents[i] for i in matches],
+                metadata=[results.metadata[i] for i in matches],
+                distances=results.distances[matches]
+            )
+        
+        # Not enough matches among the nearest neighbours - let ChromaDB filter
+        return SearchResults.from_chroma(self.course_content.query(
+            query_embeddings=[query_embedding],
+            n_results=limit,
+            where=filter_dict
+        ))
     
     def _resolve_course_name(self, course_name: str) -> Optional[str]:
-        """Use vector search to find best matching course by name"""
+        """Find best matching course by name, by title lookup first and vector search otherwise"""
         try:
+            course_title = self._match_course_title(course_name)
+            if course_title:
+                return course_title
+            
             results = self.course_catalog.query(
                 query_texts=[course_name],
                 n_results=1
@@ -115,37 +422,48 @@ class VectorStore:
         
         return None
     
+    def _match_course_title(self, course_name: str) -> Optional[str]:
+        """
+        Match a course name against stored titles without embedding it.
+        
+        Matches a title equal to the name, or the only title containing the name
+        as whole words, ignoring case and punctuation (e.g. 'mcp' or 'Prompt compression').
+        """
+        name = _normalize_title(course_name)
+        if not name:
+            return None
+        
+        catalog = self._get_catalog()
+        if catalog["title_index"] is None:
+            catalog["title_index"] = {_normalize_title(title): title for title in catalog["ids"]}
+        title_index = catalog["title_index"]
+        
+        if name in title_index:
+            return title_index[name]
+        
+        padded_name = f" {name} "
+        matches = [title for key, title in title_index.items() if padded_name in f" {key} "]
+        return matches[0] if len(matches) == 1 else None
+    
     def _build_filter(self, course_title: Optional[str], lesson_number: Optional[int]) -> Optional[Dict]:
         """Build ChromaDB filter from search parameters"""
-        if not course_title and lesson_number is None:
-            return None
-            
-        # Handle different filter combinations
-        if course_title and lesson_number is not None:
-            return {"$and": [
-                {"course_title": course_title},
-                {"lesson_number": lesson_number}
-            ]}
-        
-        if course_title:
-            return {"course_title": course_title}
-            
-        return {"lesson_number": lesson_number}
+        return _FILTER_BUILDERS[(bool(course_title), lesson_number is not None)](course_title, lesson_number)
     
     def add_course_metadata(self, course: Course):
         """Add course information to the catalog for semantic search"""
-        import json
-
         course_text = course.title
         
         # Build lessons metadata and serialize as JSON string
         lessons_metadata = []
+        lesson_links = {}
         for lesson in course.lessons:
             lessons_metadata.append({
                 "lesson_number": lesson.lesson_number,
                 "lesson_title": lesson.title,
                 "lesson_link": lesson.lesson_link
             })
+            # Keep the first lesson's link when a number repeats, as a linear scan would
+            lesson_links.setdefault(str(lesson.lesson_number), lesson.lesson_link)
         
         self.course_catalog.add(
             documents=[course_text],
@@ -153,31 +471,80 @@ class VectorStore:
                 "title": course.title,
                 "instructor": course.instructor,
                 "course_link": course.course_link,
-                "lessons_json": json.dumps(lessons_metadata),  # Serialize as JSON string
+                "lessons_json": _json_dumps(lessons_metadata),  # Serialize as JSON string
+                # Lesson number -> link, so link lookups skip the full lessons list
+                "lesson_links_json": _json_dumps(lesson_links),
                 "lesson_count": len(course.lessons)
             }],
             ids=[course.title]
         )
+        
+        # Course names may resolve differently once a new course exists
+        self._invalidate_caches(catalog=True)
     
     def add_course_content(self, chunks: List[CourseChunk]):
         """Add course content chunks to the vector store"""
         if not chunks:
             return
         
-        documents = [chunk.content for chunk in chunks]
+        # Read each chunk's fields once, then build the parallel lists from the tuples
+        fields = list(map(_CHUNK_FIELDS, chunks))
+        documents = [content for content, _, _, _ in fields]
         metadatas = [{
-            "course_title": chunk.course_title,
-            "lesson_number": chunk.lesson_number,
-            "chunk_index": chunk.chunk_index
-        } for chunk in chunks]
-        # Use title with chunk index for unique IDs
-        ids = [f"{chunk.course_title.replace(' ', '_')}_{chunk.chunk_index}" for chunk in chunks]
-        
-        self.course_content.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+            "course_title": course_title,
+            "lesson_number": lesson_number,
+            "chunk_index": chunk_index
+        } for _, course_title, lesson_number, chunk_index in fields]
+        # Use title with chunk index for unique IDs, translating each distinct title once
+        safe_titles = {title: title.translate(_ID_TRANSLATION) for title in {course_title for _, course_title, _, _ in fields}}
+        ids = [f"{safe_titles[course_title]}_{chunk_index}" for _, course_title, _, chunk_index in fields]
+        # Embed everything up front instead of letting ChromaDB embed per add() call
+        embeddings = self._embed(documents)
+        
+        # Insert in fixed-size batches rather than one large or many tiny writes
+        for start in range(0, len(chunks), self.ADD_BATCH_SIZE):
+            end = start + self.ADD_BATCH_SIZE
+            self.course_content.add(
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                embeddings=embeddings[start:end],
+                ids=ids[start:end]
+            )
+        
+        # Cached results no longer reflect the full content collection
+        self._invalidate_caches(catalog=False)
+    
+    async def add_courses_async(self, courses: List[Course], chunks_per_course: List[List[CourseChunk]]):
+        """
+        Add several courses concurrently.
+        
+        The persistent ChromaDB client is synchronous, so each course's metadata
+        and content are added on a worker thread and the adds are awaited together.
+        
+        Args:
+            courses: Courses to add to the catalog
+            chunks_per_course: Content chunks for each course, in the same order
+        
+        Raises:
+            ValueError: If the two lists have different lengths
+        """
+        # Pair everything up front so mismatched lists fail before any course is added
+        pairs = list(zip(courses, chunks_per_course, strict=True))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self._add_course, course, chunks)
+            for course, chunks in pairs
+        ))
+    
+    async def add_course_content_async(self, chunks: List[CourseChunk]):
+        """Add course content chunks on a worker thread without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.add_course_content, chunks)
+    
+    def _add_course(self, course: Course, chunks: List[CourseChunk]):
+        """Add one course's metadata and content"""
+        self.add_course_metadata(course)
+        self.add_course_content(chunks)
     
     def clear_all_data(self):
         """Clear all data from both collections"""
@@ -186,18 +553,44 @@ class VectorStore:
             self.client.delete_collection("course_content")
             # Recreate collections
             self.course_catalog = self._create_collection("course_catalog")
-            self.course_content = self._create_collection("course_content")
+            self.course_content = self._create_collection("course_content", self.CONTENT_COLLECTION_METADATA)
         except Exception as e:
             print(f"Error clearing data: {e}")
+        finally:
+            self._invalidate_caches(catalog=True)
+    
+    def _invalidate_caches(self, catalog: bool):
+        """Drop cached reads after a write, including results of reads still in flight"""
+        with self._cache_lock:
+            self._version += 1
+            self.query_cache.clear()
+            if catalog:
+                self._catalog_cache = None
+                self._lesson_link_cache.clear()
+    
+    def _get_catalog(self) -> Dict[str, Any]:
+        """Get catalog ids and metadata, querying ChromaDB only after the catalog changed"""
+        with self._cache_lock:
+            if self._catalog_cache is not None:
+                return self._catalog_cache
+            version = self._version
+        
+        results = self.course_catalog.get() or {}
+        catalog = {
+            "ids": results.get('ids') or [],
+            "metadatas": results.get('metadatas') or [],
+            "parsed_metadata": None,  # Filled on first get_all_courses_metadata call
+            "title_index": None  # Normalized title -> title, filled on first name lookup
+        }
+        with self._cache_lock:
+            if version == self._version:
+                self._catalog_cache = catalog
+        return catalog
     
     def get_existing_course_titles(self) -> List[str]:
         """Get all existing course titles from the vector store"""
         try:
-            # Get all documents from the catalog
-            results = self.course_catalog.get()
-            if results and 'ids' in results:
-                return results['ids']
-            return []
+            return list(self._get_catalog()["ids"])
         except Exception as e:
             print(f"Error getting existing course titles: {e}")
             return []
@@ -205,33 +598,62 @@ class VectorStore:
     def get_course_count(self) -> int:
         """Get the total number of courses in the vector store"""
         try:
-            results = self.course_catalog.get()
-            if results and 'ids' in results:
-                return len(results['ids'])
-            return 0
+            return len(self._get_catalog()["ids"])
         except Exception as e:
             print(f"Error getting course count: {e}")
             return 0
     
     def get_all_courses_metadata(self) -> List[Dict[str, Any]]:
         """Get metadata for all courses in the vector store"""
-        import json
         try:
-            results = self.course_catalog.get()
-            if results and 'metadatas' in results:
-                # Parse lessons JSON for each course
-                parsed_metadata = []
-                for metadata in results['metadatas']:
-                    course_meta = metadata.copy()
-                    if 'lessons_json' in course_meta:
-                        course_meta['lessons'] = json.loads(course_meta['lessons_json'])
-                        del course_meta['lessons_json']  # Remove the JSON string version
-                    parsed_metadata.append(course_meta)
-                return parsed_metadata
-            return []
+            catalog = self._get_catalog()
+            if catalog["parsed_metadata"] is None:
+                # Parse lessons JSON for each course once per catalog version; a parse
+                # error raises before anything is cached
+                catalog["parsed_metadata"] = list(self.iter_courses_metadata())
+            return [self._copy_course_metadata(course_meta) for course_meta in catalog["parsed_metadata"]]
         except Exception as e:
             print(f"Error getting courses metadata: {e}")
             return []
+    
+    def iter_courses_metadata(self, fields: Optional[Set[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield metadata for each course without building the full list.
+        
+        Unlike get_all_courses_metadata, errors reading or parsing the catalog
+        are raised rather than ending the stream early.
+        
+        Args:
+            fields: Keys to include, e.g. {'title', 'lessons'}. The lessons JSON
+                is only parsed when 'lessons' is requested. Defaults to all fields.
+        """
+        catalog = self._get_catalog()
+        if fields is None and catalog["parsed_metadata"] is not None:
+            for course_meta in catalog["parsed_metadata"]:
+                yield self._copy_course_metadata(course_meta)
+            return
+        
+        for metadata in catalog["metadatas"]:
+            yield self._parse_course_metadata(metadata, fields)
+    
+    @staticmethod
+    def _copy_course_metadata(course_meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a cached course entry, including its lessons, so callers cannot modify the cache"""
+        if 'lessons' not in course_meta:
+            return course_meta.copy()
+        return {**course_meta, 'lessons': [dict(lesson) for lesson in course_meta['lessons']]}
+    
+    @staticmethod
+    def _parse_course_metadata(metadata: Dict[str, Any], fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Turn a stored catalog entry into course metadata, limited to the requested fields"""
+        course_meta = {
+            key: value for key, value in metadata.items()
+            # lessons_json becomes 'lessons'; lesson_links_json is a lookup index, not metadata
+            if key not in ('lessons_json', 'lesson_links_json') and (fields is None or key in fields)
+        }
+        if 'lessons_json' in metadata and (fields is None or 'lessons' in fields):
+            course_meta['lessons'] = _json_loads(metadata['lessons_json'])
+        return course_meta
 
     def get_course_link(self, course_title: str) -> Optional[str]:
         """Get course link for a given course title"""
@@ -248,20 +670,30 @@ class VectorStore:
     
     def get_lesson_link(self, course_title: str, lesson_number: int) -> Optional[str]:
         """Get lesson link for a given course title and lesson number"""
-        import json
         try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and 'metadatas' in results and results['metadatas']:
+            with self._cache_lock:
+                lesson_links = self._lesson_link_cache.get(course_title)
+                version = self._version
+            
+            if lesson_links is None:
+                # Get course by ID (title is the ID)
+                results = self.course_catalog.get(ids=[course_title])
+                if not (results and 'metadatas' in results and results['metadatas']):
+                    return None
                 metadata = results['metadatas'][0]
-                lessons_json = metadata.get('lessons_json')
-                if lessons_json:
-                    lessons = json.loads(lessons_json)
-                    # Find the lesson with matching number
-                    for lesson in lessons:
-                        if lesson.get('lesson_number') == lesson_number:
-                            return lesson.get('lesson_link')
-            return None
+                
+                lesson_links_json = metadata.get('lesson_links_json')
+                if lesson_links_json:
+                    lesson_links = {int(number): link for number, link in _json_loads(lesson_links_json).items()}
+                else:
+                    # Courses stored before lesson_links_json existed only have the lessons list
+                    lesson_links = {}
+                    for lesson in _json_loads(metadata.get('lessons_json') or '[]'):
+                        lesson_links.setdefault(lesson.get('lesson_number'), lesson.get('lesson_link'))
+                with self._cache_lock:
+                    if version == self._version:
+                        self._lesson_link_cache[course_title] = lesson_links
+            
+            return lesson_links.get(lesson_number)
         except Exception as e:
             print(f"Error getting lesson link: {e}")
-    
\ No newline at end of file
@@ -0,0 +1,452 @@
+import asyncio
+import zlib
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+import vector_store
+from models import Course, CourseChunk, Lesson
+from vector_store import SearchResults, VectorStore
+
+
+def fake_encode(texts, **kwargs):
+    """Deterministic unit vectors, one per distinct text"""
+    vectors = np.stack([
+        np.random.default_rng(zlib.crc32(text.encode())).standard_normal(8)
+        for text in texts
+    ]).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def chroma_response(documents, metadatas, distances=None):
+    """Build a ChromaDB query() response for a single query"""
+    if distances is None:
+        distances = [i / 100 for i in range(len(documents))]
+    return {"documents": [documents], "metadatas": [metadatas], "distances": [distances]}
+
+
+@pytest.fixture
+def collections():
+    return {"course_catalog": MagicMock(), "course_content": MagicMock()}
+
+
+@pytest.fixture
+def store(monkeypatch, collections):
+    client = MagicMock()
+    client.get_or_create_collection.side_effect = lambda name, **kwargs: collections[name]
+    embedding_function = MagicMock()
+    embedding_function._model.encode.side_effect = fake_encode
+    monkeypatch.setattr(vector_store, "_get_client", lambda chroma_path: client)
+    monkeypatch.setattr(vector_store, "_get_embedding_function", lambda model_name: embedding_function)
+    return VectorStore("./unused", "test-model", max_results=5)
+
+
+@pytest.fixture
+def catalog(collections):
+    """Catalog holding two courses, Course A and Course B"""
+    collections["course_catalog"].get.return_value = {
+        "ids": ["Course A", "Course B"],
+        "metadatas": [{"title": "Course A"}, {"title": "Course B"}],
+    }
+    return collections["course_catalog"]
+
+
+def test_search_without_filters_queries_max_results(store):
+    store.course_content.query.return_value = chroma_response(["doc"], [{"course_title": "Course A"}])
+
+    results = store.search("test query")
+
+    assert results.documents == ["doc"]
+    kwargs = store.course_content.query.call_args.kwargs
+    assert kwargs["n_results"] == 5
+    assert "where" not in kwargs
+
+
+def test_filtered_search_post_filters_without_where(store, catalog):
+    # 50 neighbours alternating between two courses, cycling through lessons 0-4
+    metadatas = [
+        {"course_title": "Course A" if i % 2 == 0 else "Course B", "lesson_number": i % 5}
+        for i in range(50)
+    ]
+    documents = [f"doc {i}" for i in range(50)]
+    store.course_content.query.return_value = chroma_response(documents, metadatas)
+
+    results = store.search("test query", course_name="Course A", lesson_number=2)
+
+    assert results.documents == ["doc 2", "doc 12", "doc 22", "doc 32", "doc 42"]
+    assert all(meta == {"course_title": "Course A", "lesson_number": 2} for meta in results.metadata)
+    np.testing.assert_allclose(results.distances, [0.02, 0.12, 0.22, 0.32, 0.42])
+    store.course_content.query.assert_called_once()
+    kwargs = store.course_content.query.call_args.kwargs
+    assert kwargs["n_results"] == 5 * VectorStore.FILTER_OVERSAMPLE
+    assert "where" not in kwargs
+    catalog.query.assert_not_called()
+
+
+def test_filtered_search_falls_back_to_where(store, catalog):
+    metadatas = [{"course_title": "Course B", "lesson_number": 1}] * 49 + [{"course_title": "Course A", "lesson_number": 1}]
+    fallback = chroma_response(["a1", "a2"], [{"course_title": "Course A", "lesson_number": 1}] * 2)
+    store.course_content.query.side_effect = [
+        chroma_response([f"doc {i}" for i in range(50)], metadatas),
+        fallback,
+    ]
+
+    results = store.search("test query", course_name="Course A")
+
+    assert results.documents == ["a1", "a2"]
+    assert store.course_content.query.call_count == 2
+    kwargs = store.course_content.query.call_args.kwargs
+    assert kwargs["n_results"] == 5
+    assert kwargs["where"] == {"course_title": "Course A"}
+
+
+def test_search_unknown_course(store, catalog):
+    catalog.query.return_value = {"documents": [[]], "metadatas": [[]]}
+
+    results = store.search("test query", course_name="Nonexistent")
+
+    assert results.error == "No course found matching 'Nonexistent'"
+    store.course_content.query.assert_not_called()
+
+
+def test_identical_search_hits_cache_without_embedding(store):
+    store.course_content.query.return_value = chroma_response(["doc"], [{"course_title": "Course A"}])
+
+    first = store.search("test query")
+    second = store.search("test query")
+
+    assert second is first
+    store.course_content.query.assert_called_once()
+    store.embedder.encode.assert_called_once()
+
+
+def test_cache_keys_include_filters(store, catalog):
+    store.course_content.query.return_value = chroma_response(
+        ["doc"] * 5, [{"course_title": "Course A", "lesson_number": 1}] * 5
+    )
+
+    store.search("test query")
+    store.search("test query", course_name="Course A")
+    store.search("test query", lesson_number=1)
+
+    assert store.course_content.query.call_count == 3
+
+
+def test_similar_queries_miss_cache_by_default(store):
+    store.course_content.query.return_value = chroma_response(["doc"], [{"course_title": "Course A"}])
+
+    store.search("what is in lesson 2")
+    store.search("what is in lesson 3")
+
+    assert store.course_content.query.call_count == 2
+
+
+def test_similar_queries_hit_cache_when_threshold_set(store):
+    store.query_cache.threshold = 0.95
+    store.course_content.query.return_value = chroma_response(["doc"], [{"course_title": "Course A"}])
+    store.embedder.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 8), dtype=np.float32) / np.sqrt(8)
+
+    first = store.search("what is in lesson 2")
+    second = store.search("what is in lesson 3")
+
+    assert second is first
+    store.course_content.query.assert_called_once()
+
+
+def test_query_cache_evicts_least_recently_used():
+    cache = vector_store.QueryCache(max_size=2)
+    results = {query: SearchResults.empty(query) for query in ("a", "b", "c")}
+    embedding = np.ones(8, dtype=np.float32)
+
+    cache.put("a", embedding, None, results["a"])
+    cache.put("b", embedding, None, results["b"])
+    cache.get("a", None)  # "b" is now least recently used
+    cache.put("c", embedding, None, results["c"])
+
+    assert cache.get("a", None) is results["a"]
+    assert cache.get("b", None) is None
+    assert cache.get("c", None) is results["c"]
+
+
+def test_adding_content_clears_search_cache(store):
+    store.course_content.query.return_value = chroma_response(["doc"], [{"course_title": "Course A"}])
+
+    store.search("test query")
+    store.add_course_content([
+        CourseChunk(content="new", course_title="Course A", lesson_number=1, chunk_index=0)
+    ])
+    store.search("test query")
+
+    assert store.course_content.query.call_count == 2
+
+
+def test_search_started_before_write_is_not_cached(store):
+    old = chroma_response(["old"], [{"course_title": "Course A"}])
+    new = chroma_response(["old", "new"], [{"course_title": "Course A"}] * 2)
+
+    def query_during_write(**kwargs):
+        # The write lands while the first query is in flight
+        store.course_content.query.side_effect = None
+        store.course_content.query.return_value = new
+        store.add_course_content([CourseChunk(content="new", course_title="Course A", lesson_number=1, chunk_index=1)])
+        return old
+
+    store.course_content.query.side_effect = query_during_write
+
+    assert store.search("test query").documents == ["old"]
+    assert store.search("test query").documents == ["old", "new"]
+
+
+def test_catalog_read_started_before_write_is_not_cached(store, collections):
+    catalog = collections["course_catalog"]
+    old = {"ids": ["Course A"], "metadatas": [{"title": "Course A"}]}
+    new = {"ids": ["Course A", "Course B"], "metadatas": [{"title": "Course A"}, {"title": "Course B"}]}
+
+    def get_during_write(**kwargs):
+        catalog.get.side_effect = None
+        catalog.get.return_value = new
+        store.add_course_metadata(Course(title="Course B"))
+        return old
+
+    catalog.get.side_effect = get_during_write
+
+    assert store.get_course_count() == 1
+    assert store.get_course_count() == 2
+    assert store.get_course_count() == 2
+    assert catalog.get.call_count == 2
+
+
+@pytest.fixture
+def catalog_with_lessons(collections):
+    """Catalog holding Course A with two lessons"""
+    lessons = [
+        {"lesson_number": 1, "lesson_title": "Intro", "lesson_link": "https://example.com/1"},
+        {"lesson_number": 2, "lesson_title": "More", "lesson_link": "https://example.com/2"},
+    ]
+    collections["course_catalog"].get.return_value = {
+        "ids": ["Course A"],
+        "metadatas": [{
+            "title": "Course A",
+            "instructor": "Ada",
+            "lessons_json": vector_store._json_dumps(lessons),
+            "lesson_links_json": vector_store._json_dumps({"1": "https://example.com/1", "2": "https://example.com/2"}),
+            "lesson_count": 2,
+        }],
+    }
+    return collections["course_catalog"]
+
+
+def test_catalog_reads_are_cached(store, catalog):
+    assert store.get_course_count() == 2
+    assert store.get_course_count() == 2
+    assert store.get_existing_course_titles() == ["Course A", "Course B"]
+
+    catalog.get.assert_called_once()
+
+
+def test_adding_course_invalidates_catalog_cache(store, catalog):
+    store.get_course_count()
+    catalog.get.return_value = {
+        "ids": ["Course A", "Course B", "Course C"],
+        "metadatas": [{"title": "Course A"}, {"title": "Course B"}, {"title": "Course C"}],
+    }
+
+    store.add_course_metadata(Course(title="Course C"))
+
+    assert store.get_course_count() == 3
+    assert catalog.get.call_count == 2
+
+
+def test_get_all_courses_metadata_parses_lessons_once(store, catalog_with_lessons, monkeypatch):
+    json_loads = MagicMock(side_effect=vector_store._json_loads)
+    monkeypatch.setattr(vector_store, "_json_loads", json_loads)
+
+    first = store.get_all_courses_metadata()
+    second = store.get_all_courses_metadata()
+
+    assert first == second
+    assert first[0]["lessons"][1]["lesson_link"] == "https://example.com/2"
+    assert "lessons_json" not in first[0]
+    assert "lesson_links_json" not in first[0]
+    json_loads.assert_called_once()
+    catalog_with_lessons.get.assert_called_once()
+
+
+def test_get_all_courses_metadata_returns_copies(store, catalog_with_lessons):
+    courses = store.get_all_courses_metadata()
+    courses[0]["title"] = "Changed"
+    courses[0]["lessons"].append({"lesson_number": 3})
+    courses[0]["lessons"][0]["lesson_title"] = "Changed"
+
+    fresh = store.get_all_courses_metadata()[0]
+    assert fresh["title"] == "Course A"
+    assert len(fresh["lessons"]) == 2
+    assert fresh["lessons"][0]["lesson_title"] == "Intro"
+
+
+def test_iter_courses_metadata_skips_unrequested_lessons(store, catalog_with_lessons, monkeypatch):
+    json_loads = MagicMock(side_effect=vector_store._json_loads)
+    monkeypatch.setattr(vector_store, "_json_loads", json_loads)
+
+    titles = list(store.iter_courses_metadata(fields={"title"}))
+    with_lessons = list(store.iter_courses_metadata(fields={"title", "lessons"}))
+
+    assert titles == [{"title": "Course A"}]
+    assert [lesson["lesson_number"] for lesson in with_lessons[0]["lessons"]] == [1, 2]
+    json_loads.assert_called_once()
+
+
+def test_iter_courses_metadata_matches_get_all(store, catalog_with_lessons):
+    assert list(store.iter_courses_metadata()) == store.get_all_courses_metadata()
+    assert list(store.iter_courses_metadata()) == store.get_all_courses_metadata()
+
+
+def test_malformed_lessons_json_is_not_cached(store, collections):
+    catalog = collections["course_catalog"]
+    catalog.get.return_value = {
+        "ids": ["Course A", "Course B"],
+        "metadatas": [
+            {"title": "Course A", "lessons_json": "[]"},
+            {"title": "Course B", "lessons_json": "[not json"},
+        ],
+    }
+
+    assert store.get_all_courses_metadata() == []
+    with pytest.raises(ValueError):
+        list(store.iter_courses_metadata())
+
+    catalog.get.return_value["metadatas"][1]["lessons_json"] = "[]"
+    assert [course["title"] for course in store.get_all_courses_metadata()] == ["Course A", "Course B"]
+
+
+def test_normalize_title_keeps_non_ascii_letters():
+    assert vector_store._normalize_title("Café Basics") == "café basics"
+    assert vector_store._normalize_title("Введение в ИИ") == "введение в ии"
+    assert vector_store._normalize_title("機械学習 101") == "機械学習 101"
+    assert vector_store._normalize_title("MCP:  Build_Apps!") == "mcp build apps"
+
+
+def test_course_names_differing_only_in_non_ascii_letters_resolve_separately(store, collections):
+    collections["course_catalog"].get.return_value = {
+        "ids": ["Café", "Cafè"],
+        "metadatas": [{"title": "Café"}, {"title": "Cafè"}],
+    }
+
+    assert store._resolve_course_name("café") == "Café"
+    assert store._resolve_course_name("CAFÈ") == "Cafè"
+    collections["course_catalog"].query.assert_not_called()
+
+
+MCP_TITLE = "MCP: Build Rich-Context AI Apps with Anthropic"
+COMPUTER_USE_TITLE = "Building Towards Computer Use with Anthropic"
+
+
+@pytest.fixture
+def titled_catalog(collections):
+    titles = [MCP_TITLE, COMPUTER_USE_TITLE]
+    collections["course_catalog"].get.return_value = {
+        "ids": titles,
+        "metadatas": [{"title": title} for title in titles],
+    }
+    collections["course_catalog"].query.return_value = {
+        "documents": [["semantic match"]],
+        "metadatas": [[{"title": "Semantic Match"}]],
+    }
+    return collections["course_catalog"]
+
+
+@pytest.mark.parametrize("course_name, expected", [
+    ("mcp: build rich-context ai apps with anthropic", MCP_TITLE),
+    ("  MCP   Build Rich Context AI Apps with Anthropic ", MCP_TITLE),
+    ("mcp", MCP_TITLE),
+    ("Computer Use", COMPUTER_USE_TITLE),
+])
+def test_course_name_resolves_without_catalog_query(store, titled_catalog, course_name, expected):
+    assert store._resolve_course_name(course_name) == expected
+    titled_catalog.query.assert_not_called()
+
+
+@pytest.mark.parametrize("course_name", [
+    "Anthropic",  # in both titles
+    "Buil",  # not a whole word
+    "model context protocol",  # no title contains it
+])
+def test_course_name_falls_back_to_catalog_query(store, titled_catalog, course_name):
+    assert store._resolve_course_name(course_name) == "Semantic Match"
+    titled_catalog.query.assert_called_once()
+
+
+def test_add_courses_async_adds_every_course(store):
+    courses = [Course(title=f"Course {i}") for i in range(3)]
+    chunks = [
+        [CourseChunk(content=f"content {i}", course_title=course.title, lesson_number=1, chunk_index=0)]
+        for i, course in enumerate(courses)
+    ]
+
+    asyncio.run(store.add_courses_async(courses, chunks))
+
+    assert store.course_catalog.add.call_count == 3
+    assert store.course_content.add.call_count == 3
+
+
+def test_add_courses_async_rejects_mismatched_lists(store):
+    courses = [Course(title="Course A"), Course(title="Course B")]
+    chunks = [[CourseChunk(content="content", course_title="Course A", lesson_number=1, chunk_index=0)]]
+
+    with pytest.raises(ValueError):
+        asyncio.run(store.add_courses_async(courses, chunks))
+
+    store.course_catalog.add.assert_not_called()
+
+
+def test_lesson_link_keeps_first_of_repeated_numbers(store):
+    store.add_course_metadata(Course(title="Course A", lessons=[
+        Lesson(lesson_number=1, title="Intro", lesson_link="https://example.com/first"),
+        Lesson(lesson_number=1, title="Intro again", lesson_link="https://example.com/second"),
+    ]))
+    metadata = store.course_catalog.add.call_args.kwargs["metadatas"][0]
+    store.course_catalog.get.return_value = {"ids": ["Course A"], "metadatas": [metadata]}
+
+    assert store.get_lesson_link("Course A", 1) == "https://example.com/first"
+
+
+def test_lesson_link_from_lessons_json_keeps_first_of_repeated_numbers(store):
+    lessons = [
+        {"lesson_number": 1, "lesson_link": "https://example.com/first"},
+        {"lesson_number": 1, "lesson_link": "https://example.com/second"},
+    ]
+    store.course_catalog.get.return_value = {
+        "ids": ["Course A"],
+        "metadatas": [{"title": "Course A", "lessons_json": vector_store._json_dumps(lessons)}],
+    }
+
+    assert store.get_lesson_link("Course A", 1) == "https://example.com/first"
+
+
+def test_lesson_links_are_cached(store, catalog_with_lessons, monkeypatch):
+    json_loads = MagicMock(side_effect=vector_store._json_loads)
+    monkeypatch.setattr(vector_store, "_json_loads", json_loads)
+
+    assert store.get_lesson_link("Course A", 1) == "https://example.com/1"
+    assert store.get_lesson_link("Course A", 2) == "https://example.com/2"
+    assert store.get_lesson_link("Course A", 3) is None
+
+    json_loads.assert_called_once()
+    catalog_with_lessons.get.assert_called_once()
+
+
+def test_search_results_equality():
+    results = SearchResults(["a", "b"], [{}, {}], [0.1, 0.2])
+
+    assert results == SearchResults(["a", "b"], [{}, {}], np.array([0.1, 0.2]))
+    assert results != SearchResults(["a", "b"], [{}, {}], [0.1, 0.3])
+    assert results != SearchResults(["a", "b"], [{}, {}], [0.1, 0.2], error="failed")
+    assert SearchResults.empty("failed") == SearchResults.empty("failed")
+
+
+def test_search_results_below_threshold():
+    results = SearchResults(["a", "b", "c"], [{"i": 0}, {"i": 1}, {"i": 2}], [0.1, 0.5, 0.2])
+
+    assert results.below_threshold(0.3) == SearchResults(["a", "c"], [{"i": 0}, {"i": 2}], [0.1, 0.2])
+    assert results.distances.dtype == np.float32